@@ -0,0 +1,973 @@
+"""
+Preparo incremental das bases do Dashboard Canais Estratégicos (dashprep).
+
+Converte as fontes brutas (xlsx/csv) nos derivados ``*_dashprep.parquet`` lidos pelo
+app, reconstruindo apenas os derivados cuja origem mudou (data de modificação,
+tamanho e hash SHA-256) e registrando linhas, tempos e hash do schema em
+``manifest_dashprep.json``.
+
+Os parquets são gravados tipados, com colunas dimensionais em dictionary encoding,
+num único row group e na ordem das linhas da origem. ``--reparticionar`` regrava com
+um row group por mês só as bases que o app lê com filtro de mês (pushdown), para que
+o leitor pule os blocos dos outros meses.
+``--css`` minifica os estilos do app (estilos/*.css) num bundle versionado em static/.
+
+Uso:
+    python dashprep.py
+    python dashprep.py --forcar
+    python dashprep.py --somente base_principal ligacoes
+    python dashprep.py --base-dir "C:/.../Arquivos_Dashboard"
+    python dashprep.py --origem base_principal=base_final_trt_new2.xlsx
+    python dashprep.py --reparticionar
+    python dashprep.py --css
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from normalizacao_dashboard import (
+    encontrar_coluna_por_alias,
+    normalizar_chave_visual,
+    normalizar_indicadores_funil_fixa,
+    normalizar_numerico_serie,
+    normalizar_segmento_funil,
+)
+
+DASHPREP_VERSAO = "2026-10-dashprep-v1"
+DASHPREP_MANIFEST_NOME = "manifest_dashprep.json"
+DASHPREP_COMPRESSAO = "zstd"
+DASHPREP_HASH_BLOCO_BYTES = 1024 * 1024
+
+MESES_PT = {
+    1: "jan", 2: "fev", 3: "mar", 4: "abr", 5: "mai", 6: "jun",
+    7: "jul", 8: "ago", 9: "set", 10: "out", 11: "nov", 12: "dez"
+}
+MESES_PT_REVERSO = {abrev: numero for numero, abrev in MESES_PT.items()}
+
+
+# ==============================
+# NORMALIZAÇÃO (as regras compartilhadas com o app9.py ficam em normalizacao_dashboard.py)
+# ==============================
+def texto_limpo(serie: pd.Series, vazio=pd.NA) -> pd.Series:
+    """Converte para string, remove espaços e troca vazios/nulos textuais por ``vazio``."""
+    texto = (
+        serie.astype("string")
+        .str.strip()
+        .replace({"": vazio, "nan": vazio, "None": vazio, "NULL": vazio})
+    )
+    return texto if vazio is pd.NA else texto.fillna(vazio)
+
+
+def formatar_mes_ano(datas: pd.Series) -> pd.Series:
+    """Formata datas como 'mmm/aa' em PT-BR de forma vetorizada."""
+    datas = pd.to_datetime(datas, errors="coerce")
+    mes = datas.dt.month.map(MESES_PT)
+    ano = (datas.dt.year % 100).astype("Int64").astype("string").str.zfill(2)
+    return (mes.astype("string") + "/" + ano).where(datas.notna())
+
+
+def ordem_mes_ano(rotulos: pd.Series) -> pd.Series:
+    """Converte rótulos 'mmm/aa' em chave inteira AAAAMM (0 quando inválido)."""
+    partes = rotulos.astype("string").str.strip().str.lower().str.extract(r"^([a-z]{3})/(\d{2})$")
+    mes = partes[0].map(MESES_PT_REVERSO)
+    ano = pd.to_numeric(partes[1], errors="coerce") + 2000
+    return (ano * 100 + mes).fillna(0).astype("int64")
+
+
+def ler_fonte_bruta(path: Path, **kwargs) -> pd.DataFrame:
+    """Lê xlsx/csv de origem; CSV tenta UTF-8 e recorre a latin-1."""
+    suffixes = [s.lower() for s in path.suffixes]
+    if ".csv" in suffixes:
+        kwargs.setdefault("low_memory", False)
+        try:
+            return pd.read_csv(path, **kwargs)
+        except UnicodeDecodeError:
+            return pd.read_csv(path, encoding="latin-1", **kwargs)
+    if path.suffix.lower() == ".parquet":
+        return pd.read_parquet(path, columns=kwargs.get("usecols"))
+    return pd.read_excel(path, engine="openpyxl", **kwargs)
+
+
+# ==============================
+# PREPARO POR DERIVADO
+# ==============================
+BASE_PRINCIPAL_ALIASES = {
+    "REGIONAL": ("REGIONAL", "DSC_REGIONAL_CMV"),
+    "CANAL_PLAN": ("CANAL_PLAN", "DSC_CANAL"),
+    "DSC_INDICADOR": ("DSC_INDICADOR",),
+    "COD_PLATAFORMA": ("COD_PLATAFORMA",),
+    "QTDE": ("QTDE",),
+    "DESAFIO_QTD": ("DESAFIO_QTD",),
+    "DAT_MOVIMENTO2": ("DAT_MOVIMENTO2", "DAT_MOVIMENTO", "DAT_MOVIMENTO_2", "PERIODO"),
+    "DSC_MOTIVO_STS": ("DSC_MOTIVO_STS",),
+    "dat_tratada": ("dat_tratada",),
+    "ID_AFILIADOS": ("ID_AFILIADOS", "ID_AFILIADO"),
+    "ORIGEM_AFILIADOS": ("ORIGEM_AFILIADOS", "ORIGEM_AFILIADO"),
+    "TEND_QTD": ("TEND_QTD",),
+    "mes_ano": ("mes_ano",),
+}
+
+COTACOES_CANAIS_VENDA_PERMITIDOS = {
+    normalizar_chave_visual("CORPPME"),
+    normalizar_chave_visual("CORPLP"),
+    normalizar_chave_visual("NETPME"),
+}
+COTACOES_ALIASES = {
+    "COTACAO_ID": ("COTAÇÃO", "COTACAO", "FÚNIL FIXA"),
+    "DATA_CRIACAO_COTACAO": ("DATA CRIAÇÃO COTAÇÃO", "DATA CRIACAO COTACAO"),
+    "CANAL_DE_VENDA": ("CANAL DE VENDA",),
+    "CANAL_PLAN": ("CANAL_PLAN", "CANAL PLAN", "CANAL_TERRITORIO"),
+    "REGIONAL": (
+        "REGIONAL", "REGIONAL CRIADOR COTAÇÃO", "REGIONAL CRIADOR COTACAO",
+        "REGIONAL CLIENTE", "REGIONAL_TERRITORIO"
+    ),
+    "STATUS_ATUAL": ("STATUS ATUAL",),
+    "QTD_NOVAS_LINHAS_ATIVAR": ("QUANTIDADE NOVAS LINHAS A SEREM ATIVADAS",),
+    "QTD_LINHAS_VOZ": ("QTD LINHAS VOZ",),
+    "LISTA_ATIVIDADES": ("LISTA ATIVIDADES",),
+}
+
+BACKLOG_MAPEAMENTO_CANAIS_NORM = {
+    normalizar_chave_visual("DAC"): "S2S+DAC",
+    normalizar_chave_visual("DAC Adequacao de Pacote"): "S2S+DAC",
+    normalizar_chave_visual("Hospitality PME"): "Hospitality PME",
+    normalizar_chave_visual("Internet"): "E-Commerce",
+    normalizar_chave_visual("Ativo Aquisicao Direto"): "Televendas Ativo",
+    normalizar_chave_visual("Ativo Aquisicao Indireto"): "Televendas Ativo",
+    normalizar_chave_visual("Ativo Rentabilizacao Indireto"): "Televendas Ativo",
+    normalizar_chave_visual("Receptivo"): "Televendas Receptivo",
+    normalizar_chave_visual("Receptivo Rentabilizacao Exclusivo"): "Televendas Receptivo",
+    normalizar_chave_visual("Inside Sales"): "Consultivo Remoto",
+    normalizar_chave_visual("Consultivo Remoto"): "Consultivo Remoto",
+}
+
+
+def preparar_base_principal(path: Path) -> pd.DataFrame:
+    """Base de ativações: renomeia aliases, tipa medidas/datas e garante mes_ano/dat_tratada."""
+    header = ler_fonte_bruta(path, nrows=0)
+    rename_map = {}
+    for destino, aliases in BASE_PRINCIPAL_ALIASES.items():
+        coluna = next((alias for alias in aliases if alias in header.columns), None)
+        if coluna is not None:
+            rename_map[coluna] = destino
+    df = ler_fonte_bruta(path, usecols=list(rename_map)).rename(columns=rename_map)
+
+    df["DAT_MOVIMENTO2"] = pd.to_datetime(df.get("DAT_MOVIMENTO2"), errors="coerce")
+    if "mes_ano" not in df.columns:
+        df["mes_ano"] = df["dat_tratada"] if "dat_tratada" in df.columns else formatar_mes_ano(df["DAT_MOVIMENTO2"])
+    if "dat_tratada" not in df.columns:
+        df["dat_tratada"] = df["mes_ano"]
+
+    for coluna in ["REGIONAL", "CANAL_PLAN", "DSC_INDICADOR", "COD_PLATAFORMA", "DSC_MOTIVO_STS",
+                   "dat_tratada", "mes_ano", "ID_AFILIADOS", "ORIGEM_AFILIADOS"]:
+        if coluna in df.columns:
+            df[coluna] = texto_limpo(df[coluna])
+    for coluna in ["QTDE", "DESAFIO_QTD", "TEND_QTD"]:
+        if coluna in df.columns:
+            df[coluna] = normalizar_numerico_serie(df[coluna]).fillna(0)
+    return df
+
+
+def preparar_ligacoes(path: Path) -> pd.DataFrame:
+    """Ligações do receptivo no layout de ``load_ligacoes_raw_tratada``."""
+    header = ler_fonte_bruta(path, nrows=0)
+    colunas = set(header.columns)
+    coluna_qtd = next((c for c in ["QTD", "QTDE"] if c in colunas), None)
+    coluna_data = next((c for c in ["DATA_MOVIMENTO", "DAT_MOVIMENTO", "DAT_MOVIMENTO2", "DATA", "PERIODO"] if c in colunas), None)
+    if coluna_qtd is None or coluna_data is None:
+        raise ValueError("Colunas obrigatórias de ligações não encontradas (QTD/QTDE e data).")
+
+    leitura = [coluna_qtd, coluna_data] + [
+        c for c in ["CABEADO", "COD_PLATAFORMA", "DSC_REGIONAL_CMV", "REGIONAL", "TELEFONE"] if c in colunas
+    ]
+    df = ler_fonte_bruta(path, usecols=leitura)
+    df["DAT_MOVIMENTO2"] = pd.to_datetime(df[coluna_data], errors="coerce")
+    df = df.loc[df["DAT_MOVIMENTO2"].notna()].copy()
+    df["DATA_DIA"] = df["DAT_MOVIMENTO2"].dt.normalize()
+    df["mes_ano"] = formatar_mes_ano(df["DAT_MOVIMENTO2"])
+    df["dat_tratada"] = df["mes_ano"]
+
+    coluna_regional = next((c for c in ["DSC_REGIONAL_CMV", "REGIONAL"] if c in df.columns), None)
+    df["REGIONAL"] = (
+        df[coluna_regional].astype("string").str.strip().str[:3].str.upper()
+        if coluna_regional else ""
+    )
+    df["QTDE"] = normalizar_numerico_serie(df[coluna_qtd]).fillna(0).astype("int64")
+    df["TELEFONE"] = df["TELEFONE"].astype("string").fillna("") if "TELEFONE" in df.columns else ""
+    df["TIPO_CHAMADA"] = np.where(
+        df["TELEFONE"].astype(str).str.contains("0960|8449", regex=True, na=False),
+        "Click to Call",
+        "DEMAIS"
+    )
+    if "CABEADO" in df.columns:
+        df["FLAG_FIXA"] = df["CABEADO"].astype(str).str.strip().str.upper().isin({"SIM", "S", "TRUE", "1", "FIXA"})
+    else:
+        df["FLAG_FIXA"] = df["COD_PLATAFORMA"].astype(str).str.strip().str.upper().eq("FIXA")
+        df["CABEADO"] = np.where(df["FLAG_FIXA"], "SIM", "NAO")
+    df["COD_PLATAFORMA"] = np.where(df["FLAG_FIXA"], "FIXA", "CONTA")
+    df["CANAL_PLAN"] = "Televendas Receptivo"
+    df["DSC_INDICADOR"] = "LIGACOES"
+    df["DESAFIO_QTD"] = 0.0
+    return df[[
+        "DAT_MOVIMENTO2", "DATA_DIA", "mes_ano", "dat_tratada", "REGIONAL", "CANAL_PLAN",
+        "COD_PLATAFORMA", "DSC_INDICADOR", "QTDE", "DESAFIO_QTD", "CABEADO", "TIPO_CHAMADA",
+        "TELEFONE", "FLAG_FIXA"
+    ]]
+
+
+def preparar_cotacoes(path: Path) -> pd.DataFrame:
+    """Fluxo de vida da cotação já filtrado pela regra de novas linhas (CORPPME/CORPLP/NETPME)."""
+    header = ler_fonte_bruta(path, nrows=0)
+    mapa = {destino: encontrar_coluna_por_alias(header.columns, *aliases) for destino, aliases in COTACOES_ALIASES.items()}
+    faltantes = [destino for destino, coluna in mapa.items() if coluna is None and destino not in {"COTACAO_ID", "STATUS_ATUAL"}]
+    if faltantes:
+        raise ValueError(f"Colunas obrigatórias de cotações não encontradas: {', '.join(faltantes)}")
+
+    rename_map = {coluna: destino for destino, coluna in mapa.items() if coluna}
+    df = ler_fonte_bruta(path, usecols=list(rename_map)).rename(columns=rename_map)
+    if "COTACAO_ID" not in df.columns:
+        df["COTACAO_ID"] = pd.NA
+    if "STATUS_ATUAL" not in df.columns:
+        df["STATUS_ATUAL"] = ""
+
+    df["DATA_CRIACAO_COTACAO"] = pd.to_datetime(df["DATA_CRIACAO_COTACAO"], errors="coerce")
+    df["QTD_NOVAS_LINHAS_ATIVAR"] = normalizar_numerico_serie(df["QTD_NOVAS_LINHAS_ATIVAR"]).fillna(0)
+    df["QTD_LINHAS_VOZ"] = normalizar_numerico_serie(df["QTD_LINHAS_VOZ"]).fillna(0)
+    atividades_norm = df["LISTA_ATIVIDADES"].astype(str).map(normalizar_chave_visual)
+    canal_venda_norm = df["CANAL_DE_VENDA"].astype(str).map(normalizar_chave_visual)
+    mask_regra = (
+        df["QTD_NOVAS_LINHAS_ATIVAR"].ne(0) &
+        df["QTD_LINHAS_VOZ"].ne(0) &
+        canal_venda_norm.isin(COTACOES_CANAIS_VENDA_PERMITIDOS) &
+        (
+            atividades_norm.str.contains(r"\bnovo\b", regex=True, na=False) |
+            atividades_norm.str.contains(r"\bincremento de linhas\b", regex=True, na=False)
+        ) &
+        df["DATA_CRIACAO_COTACAO"].notna()
+    )
+    df = df.loc[mask_regra].copy()
+
+    df["CANAL_PLAN"] = texto_limpo(df["CANAL_PLAN"], "Canal nao informado")
+    df["REGIONAL"] = texto_limpo(df["REGIONAL"].astype("string").str.upper().str[:3], "N/I")
+    df["STATUS_ATUAL"] = texto_limpo(df["STATUS_ATUAL"], "Status nao informado")
+    df["mes_ano"] = formatar_mes_ano(df["DATA_CRIACAO_COTACAO"])
+    df["dat_tratada"] = df["mes_ano"]
+    df["COTACAO_ID"] = texto_limpo(df["COTACAO_ID"])
+    df["QTD_NOVAS_LINHAS_ATIVAR"] = df["QTD_NOVAS_LINHAS_ATIVAR"].astype("int64")
+    df["VALOR_NOVAS_LINHAS"] = df["QTD_NOVAS_LINHAS_ATIVAR"]
+
+    chaves = ["DATA_CRIACAO_COTACAO", "mes_ano", "dat_tratada", "CANAL_PLAN", "REGIONAL", "STATUS_ATUAL"]
+    df_out = (
+        df.groupby(chaves, as_index=False, observed=True, dropna=False)
+        .agg(
+            VALOR_NOVAS_LINHAS=("VALOR_NOVAS_LINHAS", "sum"),
+            QTD_COTACOES_UNICAS=("COTACAO_ID", "nunique"),
+            QTD_NOVAS_LINHAS_ATIVAR=("QTD_NOVAS_LINHAS_ATIVAR", "sum"),
+        )
+    )
+    df_out["QTD_COTACOES_UNICAS"] = df_out["QTD_COTACOES_UNICAS"].astype("float64")
+    return df_out
+
+
+def preparar_cotacoes_agregado(path: Path) -> pd.DataFrame:
+    """Agregado mês/canal/regional/status das novas linhas de cotações."""
+    df_cot = preparar_cotacoes(path)
+    return (
+        df_cot.groupby(["mes_ano", "CANAL_PLAN", "REGIONAL", "STATUS_ATUAL"], as_index=False, observed=True)
+        ["VALOR_NOVAS_LINHAS"]
+        .sum()
+    )
+
+
+def preparar_backlog(path: Path) -> pd.DataFrame:
+    """Backlog de Novos Domicílios consolidado em contratos únicos por regional/canal/mês/status."""
+    usecols = [
+        "SK_DATA", "NR_CONTRATO", "NM_VISAO_ANALISE", "NM_REGIONAL",
+        "NM_CANAL_VENDA_SUBGRUPO", "NOME_OS_TIPO_STATUS_AGENDA", "DT_AGENDA_ORDEM_SERVICO",
+    ]
+    header = ler_fonte_bruta(path, nrows=0)
+    usecols = [col for col in usecols if col in header.columns]
+    obrigatorias = {"NR_CONTRATO", "NM_VISAO_ANALISE", "NM_REGIONAL", "NM_CANAL_VENDA_SUBGRUPO"}
+    if not obrigatorias.issubset(usecols) or not ({"SK_DATA", "DT_AGENDA_ORDEM_SERVICO"} & set(usecols)):
+        raise ValueError("Colunas obrigatórias do backlog não encontradas.")
+    df = ler_fonte_bruta(path, usecols=usecols, dtype={col: "string" for col in usecols})
+    for coluna in usecols:
+        df[coluna] = df[coluna].astype("string").str.strip()
+
+    canais_norm = df["NM_CANAL_VENDA_SUBGRUPO"].map(normalizar_chave_visual)
+    df = df.loc[
+        df["NM_VISAO_ANALISE"].map(normalizar_chave_visual).eq(normalizar_chave_visual("Novos Domicilios")) &
+        canais_norm.isin(BACKLOG_MAPEAMENTO_CANAIS_NORM.keys())
+    ].copy()
+    df["NM_CANAL_VENDA_SUBGRUPO"] = canais_norm.loc[df.index].map(BACKLOG_MAPEAMENTO_CANAIS_NORM)
+    df["NR_CONTRATO"] = texto_limpo(df["NR_CONTRATO"].str.replace(r"\.0$", "", regex=True))
+    df["NM_REGIONAL"] = texto_limpo(df["NM_REGIONAL"], "Não Informado")
+    if "NOME_OS_TIPO_STATUS_AGENDA" not in df.columns:
+        df["NOME_OS_TIPO_STATUS_AGENDA"] = "Não Informado"
+    df["NOME_OS_TIPO_STATUS_AGENDA"] = texto_limpo(df["NOME_OS_TIPO_STATUS_AGENDA"], "Não Informado")
+
+    data_ref = pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns]")
+    if "SK_DATA" in df.columns:
+        sk_data = df["SK_DATA"].str.replace(r"\.0$", "", regex=True).str.zfill(8)
+        data_ref = pd.to_datetime(sk_data, format="%Y%m%d", errors="coerce")
+    if "DT_AGENDA_ORDEM_SERVICO" in df.columns:
+        data_ref = data_ref.combine_first(pd.to_datetime(df["DT_AGENDA_ORDEM_SERVICO"], errors="coerce"))
+    df["MES_ANO"] = formatar_mes_ano(data_ref)
+    df = df.loc[df["NR_CONTRATO"].notna() & df["MES_ANO"].notna()]
+
+    return (
+        df.groupby(["NM_REGIONAL", "NM_CANAL_VENDA_SUBGRUPO", "MES_ANO", "NOME_OS_TIPO_STATUS_AGENDA"], as_index=False)
+        ["NR_CONTRATO"]
+        .nunique()
+        .rename(columns={"NR_CONTRATO": "QTD_CONTRATOS"})
+    )
+
+
+def preparar_migracoes(path: Path) -> pd.DataFrame:
+    """Migrações PME por regional (3 letras) e mês de referência."""
+    header = ler_fonte_bruta(path, nrows=0)
+    coluna_data = encontrar_coluna_por_alias(header.columns, "DAT_REFERENCIA", "DATA_REFERENCIA", "DAT REFERENCIA")
+    coluna_regional = encontrar_coluna_por_alias(
+        header.columns, "DSC_REGIONAL_CMV", "DSC REGIONAL CMV", "REGIONAL_CMV", "REGIONAL CMV", "DSC_REGIONAL", "REGIONAL"
+    )
+    coluna_qtde = encontrar_coluna_por_alias(header.columns, "QTDE_FINAL", "QTDE FINAL", "QTDE", "QTD", "QUANTIDADE")
+    if not coluna_data or not coluna_regional or not coluna_qtde:
+        raise ValueError("Colunas obrigatórias de migrações não encontradas.")
+
+    df = ler_fonte_bruta(path, usecols=[coluna_data, coluna_regional, coluna_qtde]).rename(
+        columns={coluna_data: "DAT_REFERENCIA", coluna_regional: "REGIONAL", coluna_qtde: "QTDE"}
+    )
+    datas = pd.to_datetime(df["DAT_REFERENCIA"], format="mixed", errors="coerce", dayfirst=True)
+    df["REGIONAL"] = (
+        df["REGIONAL"].astype("string").str.strip().str.upper().str[:3]
+        .replace({"": pd.NA, "NAN": pd.NA, "NON": pd.NA, "NUL": pd.NA})
+    )
+    df["QTDE"] = normalizar_numerico_serie(df["QTDE"]).fillna(0.0)
+    df["MES_ANO"] = formatar_mes_ano(datas)
+    return df.loc[df["MES_ANO"].notna() & df["REGIONAL"].notna(), ["REGIONAL", "MES_ANO", "QTDE"]]
+
+
+def _finalizar_funil(df: pd.DataFrame) -> pd.DataFrame:
+    """Campos comuns ao funil Fixa e à sua tendência (segmento, indicador, período e ordem do mês).
+
+    Indicadores fora da configuração do funil saem; os demais ganham chave, rótulo
+    de exibição e ordem pelas mesmas regras da carga no app.
+    """
+    df["SEGMENTO"] = df["SEGMENTO"].map(normalizar_segmento_funil)
+    df = df.loc[df["SEGMENTO"].isin(["PF", "PME"])].copy()
+    df["INDICADOR"] = df["INDICADOR"].astype(str).str.strip()
+    df["INDICADOR_CHAVE"] = ""
+    if "INDICADOR_ORDEM" not in df.columns:
+        df["INDICADOR_ORDEM"] = 999
+    df = normalizar_indicadores_funil_fixa(df)
+    df["QTDE"] = normalizar_numerico_serie(df["QTDE"]).fillna(0.0).astype("float64")
+    df["PERIODO_MES"] = pd.to_datetime(df["PERIODO_MES"], format="mixed", errors="coerce", dayfirst=True)
+    df = df.loc[df["PERIODO_MES"].notna()].copy()
+    df["MES_ANO"] = formatar_mes_ano(df["PERIODO_MES"])
+    df["MES_ANO_ORDEM"] = (df["PERIODO_MES"].dt.year * 100 + df["PERIODO_MES"].dt.month).astype("int64")
+    df["INDICADOR_ORDEM"] = df["INDICADOR_ORDEM"].astype("int64")
+    return df
+
+
+def preparar_funil_fixa(path: Path) -> pd.DataFrame:
+    """Funil Fixa E-Commerce realizado, com colunas renomeadas para o layout do app."""
+    df_raw = ler_fonte_bruta(path)
+    aliases = {
+        "SEGMENTO": ("SEGMENTO",),
+        "ORIGEM_AGG": ("ORIGEM_AGG", "ORIGEM AGG"),
+        "CANAL_ENTRADA": ("CANAL_ENTRADA", "CANAL ENTRADA", "CANAL DE ENTRADA"),
+        "INDICADOR": ("INDICADOR",),
+        "INDICADOR_ORDEM": ("INDICADOR_ORDEM", "INDICADOR ORDEM"),
+        "PERIODO_MES": ("PERIODO_MES", "PERIODO MES"),
+        "QTDE": ("QTDE",),
+    }
+    rename_map = {}
+    for destino, alts in aliases.items():
+        coluna = encontrar_coluna_por_alias(df_raw.columns, *alts)
+        if coluna is not None:
+            rename_map[coluna] = destino
+    if not {"SEGMENTO", "ORIGEM_AGG", "INDICADOR", "PERIODO_MES", "QTDE"}.issubset(rename_map.values()):
+        raise ValueError("Colunas obrigatórias do funil Fixa não encontradas.")
+    df = df_raw.rename(columns=rename_map)[list(rename_map.values())].copy()
+    if "CANAL_ENTRADA" not in df.columns:
+        df["CANAL_ENTRADA"] = "Não Informado"
+    for coluna in ["ORIGEM_AGG", "CANAL_ENTRADA"]:
+        df[coluna] = df[coluna].astype(str).str.strip()
+    df = _finalizar_funil(df)
+    df["EH_TEND"] = 0
+    return df[[
+        "SEGMENTO", "ORIGEM_AGG", "INDICADOR", "PERIODO_MES", "QTDE", "INDICADOR_ORDEM",
+        "CANAL_ENTRADA", "MES_ANO", "MES_ANO_ORDEM", "INDICADOR_CHAVE", "EH_TEND"
+    ]]
+
+
+def preparar_tend_funil_fixa(path: Path) -> pd.DataFrame:
+    """Tendência mensal do funil Fixa por segmento/indicador."""
+    df_raw = ler_fonte_bruta(path)
+    rename_map = {}
+    for destino, alts in {
+        "SEGMENTO": ("SEGMENTO",),
+        "INDICADOR": ("INDICADOR",),
+        "PERIODO_MES": ("PERIODO", "PERIODO_MES", "PERIODO MES"),
+        "QTDE": ("QTDE",),
+    }.items():
+        coluna = encontrar_coluna_por_alias(df_raw.columns, *alts)
+        if coluna is None:
+            raise ValueError(f"Coluna obrigatória da tendência do funil não encontrada: {destino}")
+        rename_map[coluna] = destino
+    df = _finalizar_funil(df_raw.rename(columns=rename_map)[list(rename_map.values())].copy())
+    return df[["SEGMENTO", "INDICADOR", "PERIODO_MES", "QTDE", "INDICADOR_CHAVE", "INDICADOR_ORDEM", "MES_ANO", "MES_ANO_ORDEM"]]
+
+
+CONVERGENCIA_ALIASES = {
+    "DAT_MOVIMENTO": ("DAT_MOVIMENTO", "DATA_MOVIMENTO", "DATA", "PERIODO"),
+    "DSC_REGIONAL": ("DSC_REGIONAL", "REGIONAL", "DSC_REGIONAL_CMV"),
+    "DSC_CANAL_VENDA": ("DSC_CANAL_VENDA", "CANAL_PLAN", "DSC_CANAL", "CANAL"),
+    "DSC_TIPO_ORIGEM": ("DSC_TIPO_ORIGEM", "COD_PLATAFORMA", "PRODUTO", "PLATAFORMA"),
+    "QTDE": ("QTDE", "QTD"),
+    "QTDE_CNPJ8": ("QTDE_CNPJ8", "QTD_CNPJ8", "QTDE_CLIENTES", "CLIENTES"),
+    "FLG_INCREMENTO": ("FLG_INCREMENTO", "FLAG_INCREMENTO"),
+    "FLG_PORTABILIDADE": ("FLG_PORTABILIDADE", "FLAG_PORTABILIDADE"),
+    "FLG_MIGRACAO": ("FLG_MIGRACAO", "FLAG_MIGRACAO"),
+    "FLG_RENOVACAO": ("FLG_RENOVACAO", "FLAG_RENOVACAO"),
+    "FLG_TROCA_TITULARIDADE": ("FLG_TROCA_TITULARIDADE", "FLAG_TROCA_TITULARIDADE"),
+    "FLG_VENDA_CONVERGENTE": ("FLG_VENDA_CONVERGENTE", "FLAG_VENDA_CONVERGENTE", "VENDA_CONVERGENTE"),
+    "FLG_NOVO": ("FLG_NOVO", "FLAG_NOVO"),
+    "FLG_NOVO_NOVO": ("FLG_NOVO_NOVO", "FLAG_NOVO_NOVO", "FLG_NOVO-NOVO"),
+}
+
+
+def preparar_convergencia(path: Path) -> pd.DataFrame:
+    """Base de convergência com as colunas do app já renomeadas e a data tipada."""
+    header = ler_fonte_bruta(path, nrows=0)
+    rename_map = {}
+    for destino, aliases in CONVERGENCIA_ALIASES.items():
+        coluna = encontrar_coluna_por_alias(header.columns, *aliases)
+        if coluna is not None:
+            rename_map[coluna] = destino
+    obrigatorias = {"DAT_MOVIMENTO", "DSC_REGIONAL", "DSC_CANAL_VENDA", "DSC_TIPO_ORIGEM", "QTDE", "QTDE_CNPJ8"}
+    if not obrigatorias.issubset(rename_map.values()):
+        raise ValueError("Colunas obrigatórias de convergência não encontradas.")
+
+    df = ler_fonte_bruta(path, usecols=list(rename_map)).rename(columns=rename_map)
+    df["DAT_MOVIMENTO"] = pd.to_datetime(df["DAT_MOVIMENTO"], format="mixed", errors="coerce", dayfirst=True)
+    df = df.loc[df["DAT_MOVIMENTO"].notna()].copy()
+    df["mes_ano"] = formatar_mes_ano(df["DAT_MOVIMENTO"])
+    for coluna in ["QTDE", "QTDE_CNPJ8"]:
+        df[coluna] = normalizar_numerico_serie(df[coluna]).fillna(0)
+    for coluna in df.columns.difference(["DAT_MOVIMENTO", "QTDE", "QTDE_CNPJ8"]):
+        df[coluna] = df[coluna].astype("string").str.strip()
+    return df
+
+
+# Cada derivado: origem bruta, parquet de destino e função de preparo. Um derivado só
+# ganha "coluna_mes" (um row group por mês) quando o app passar a lê-lo por mês; em
+# arquivos pequenos e lidos inteiros, os blocos por mês só aumentam o arquivo.
+DERIVADOS_DASHPREP: dict[str, dict] = {
+    "base_principal": {
+        "origem": "base_final_trt_new3.xlsx",
+        "destino": "base_final_trt_new3_dashprep.parquet",
+        "preparo": preparar_base_principal,
+    },
+    "ligacoes": {
+        "origem": "televendas_ligacoes2.xlsx",
+        "destino": "televendas_ligacoes2_dashprep.parquet",
+        "preparo": preparar_ligacoes,
+    },
+    "cotacoes": {
+        "origem": "RelatorioFluxoVidaCotacao.xlsx",
+        "destino": "RelatorioFluxoVidaCotacao_dashprep.parquet",
+        "preparo": preparar_cotacoes,
+    },
+    "cotacoes_agregado": {
+        "origem": "RelatorioFluxoVidaCotacao.xlsx",
+        "destino": "RelatorioFluxoVidaCotacao_agregado_dashprep.parquet",
+        "preparo": preparar_cotacoes_agregado,
+    },
+    "backlog": {
+        "origem": "backlog_consolidado.csv",
+        "destino": "backlog_consolidado_dashprep.parquet",
+        "preparo": preparar_backlog,
+    },
+    "migracoes": {
+        "origem": "ANALITICO_MIGRACOES_fev26.xlsx",
+        "destino": "ANALITICO_MIGRACOES_fev26_dashprep.parquet",
+        "preparo": preparar_migracoes,
+    },
+    "funil_fixa": {
+        "origem": "base_funil_ecomm_fixa.xlsx",
+        "destino": "base_funil_ecomm_fixa_dashprep.parquet",
+        "preparo": preparar_funil_fixa,
+    },
+    "tend_funil_fixa": {
+        "origem": "tend_funil_ecom.xlsx",
+        "destino": "tend_funil_ecom_dashprep.parquet",
+        "preparo": preparar_tend_funil_fixa,
+    },
+    "convergencia": {
+        "origem": "base_convergencia.xlsx",
+        "destino": "base_convergencia_dashprep.parquet",
+        "preparo": preparar_convergencia,
+    },
+}
+
+
+# Bases pré-processadas (não geradas pelo dashprep) que o app lê com filtro de mês, com
+# a coluna de mês usada no layout de um row group por mês (--reparticionar). As demais
+# são lidas inteiras e ficam como estão. Hoje só a necessidade diária da capa lê por mês;
+# Resultado dos Canais (M, M-1, M-2, YoY, YTD) e as outras visões por janela saem do cubo
+# montado uma vez sobre a base mensal inteira, que também alimenta a lista de meses.
+PREPROCESSADOS_COLUNA_MES = {
+    "home_analitica_diaria.parquet": "dat_tratada",
+}
+
+
+# ==============================
+# ESCRITA TIPADA E MANIFESTO
+# ==============================
+def tipar_dataframe_dashprep(df: pd.DataFrame) -> pd.DataFrame:
+    """Converte textos em category (dictionary encoding no parquet) e floats inteiros em int64."""
+    df = df.reset_index(drop=True).copy()
+    for coluna in df.columns:
+        serie = df[coluna]
+        if isinstance(serie.dtype, pd.CategoricalDtype) or pd.api.types.is_bool_dtype(serie):
+            continue
+        if pd.api.types.is_object_dtype(serie) or pd.api.types.is_string_dtype(serie):
+            df[coluna] = serie.astype("string").astype("category")
+        elif pd.api.types.is_float_dtype(serie):
+            valores = serie.to_numpy()
+            finitos = np.isfinite(valores)
+            if finitos.all() and np.array_equal(valores, np.round(valores)):
+                df[coluna] = serie.astype("int64")
+    return df
+
+
+def hash_schema_arrow(schema: pa.Schema) -> str:
+    """Hash estável do schema (nomes e tipos), sem os metadados do pandas."""
+    assinatura = "|".join(f"{campo.name}:{campo.type}" for campo in schema.remove_metadata())
+    return hashlib.sha256(assinatura.encode("utf-8")).hexdigest()[:16]
+
+
+def _gravar_parquet_atomico(
+    destino: Path,
+    schema: pa.Schema,
+    blocos,
+    write_statistics: bool | list[str] = True
+) -> int:
+    """Grava cada tabela de ``blocos`` como um row group, via arquivo temporário + replace."""
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_nome = tempfile.mkstemp(prefix=f".{destino.stem}_", suffix=".parquet.tmp", dir=destino.parent)
+    os.close(fd)
+    qtd_blocos = 0
+    try:
+        with pq.ParquetWriter(
+            tmp_nome,
+            schema,
+            compression=DASHPREP_COMPRESSAO,
+            use_dictionary=True,
+            write_statistics=write_statistics
+        ) as writer:
+            for tabela in blocos:
+                writer.write_table(tabela, row_group_size=max(tabela.num_rows, 1))
+                qtd_blocos += 1
+        os.chmod(tmp_nome, 0o644)
+        os.replace(tmp_nome, destino)
+    finally:
+        if os.path.exists(tmp_nome):
+            os.remove(tmp_nome)
+    return qtd_blocos
+
+
+def _fatias_por_mes(rotulos: pd.Series) -> tuple[np.ndarray, list[tuple[int, int]]]:
+    """Permutação que agrupa as linhas por mês e as fatias (início, tamanho) de cada mês.
+
+    Os meses seguem a ordem da primeira aparição e, dentro de cada mês, as linhas
+    mantêm a ordem original (ordenação estável), de modo que quem lê o arquivo
+    inteiro vê cada mês na mesma sequência de antes.
+    """
+    codigos, _ = pd.factorize(ordem_mes_ano(rotulos).to_numpy())
+    indices = np.argsort(codigos, kind="stable")
+    codigos = codigos[indices]
+    if not len(codigos):
+        return indices, []
+    cortes = np.flatnonzero(np.diff(codigos)) + 1
+    inicios = np.concatenate(([0], cortes))
+    fins = np.concatenate((cortes, [len(codigos)]))
+    return indices, [(int(ini), int(fim - ini)) for ini, fim in zip(inicios, fins)]
+
+
+def gravar_parquet_por_mes(df: pd.DataFrame, destino: Path, coluna_mes: str | None) -> dict:
+    """Grava o parquet de forma atômica (arquivo temporário + replace).
+
+    Sem ``coluna_mes`` sai um único row group na ordem das linhas; com ela, um row
+    group por mês, com estatísticas só na coluna de mês (as demais não ajudam o
+    pushdown e pesam em cada bloco).
+    """
+    df = tipar_dataframe_dashprep(df)
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    tabela = pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+    blocos = [tabela]
+    estatisticas: bool | list[str] = True
+    if coluna_mes and coluna_mes in df.columns and not df.empty:
+        indices, fatias = _fatias_por_mes(df[coluna_mes])
+        tabela = tabela.take(pa.array(indices))
+        blocos = [tabela.slice(inicio, tamanho) for inicio, tamanho in fatias]
+        estatisticas = [coluna_mes]
+
+    qtd_blocos = _gravar_parquet_atomico(destino, schema, blocos, write_statistics=estatisticas)
+    return {
+        "linhas": int(len(df)),
+        "colunas": int(len(df.columns)),
+        "row_groups": int(qtd_blocos),
+        "schema_hash": hash_schema_arrow(schema),
+    }
+
+
+def meses_por_row_group(path: Path, coluna_mes: str) -> list[str] | None:
+    """Mês de cada row group segundo as estatísticas; None se algum bloco mistura meses."""
+    arquivo = pq.ParquetFile(path)
+    if coluna_mes not in arquivo.schema_arrow.names:
+        return None
+    indice = arquivo.schema_arrow.get_field_index(coluna_mes)
+    meses = []
+    for i in range(arquivo.metadata.num_row_groups):
+        stats = arquivo.metadata.row_group(i).column(indice).statistics
+        if stats is None or not stats.has_min_max or stats.min != stats.max or stats.null_count:
+            return None
+        meses.append(str(stats.min))
+    return meses
+
+
+def reparticionar_parquet_por_mes(path: Path, coluna_mes: str) -> dict:
+    """Regrava um parquet já pronto com um row group por mês, preservando schema e tipos.
+
+    Os meses ficam na ordem da primeira aparição e as linhas de cada mês na ordem
+    original.
+    """
+    meses_atuais = meses_por_row_group(path, coluna_mes)
+    if meses_atuais is not None and len(set(meses_atuais)) == len(meses_atuais):
+        return {"status": "inalterado", "row_groups": len(meses_atuais)}
+
+    arquivo = pq.ParquetFile(path)
+    tabela = arquivo.read()
+    if coluna_mes not in tabela.column_names:
+        return {"status": "sem_coluna_mes", "row_groups": arquivo.metadata.num_row_groups}
+
+    indices, fatias = _fatias_por_mes(pd.Series(tabela.column(coluna_mes).to_pandas()))
+    tabela = tabela.take(pa.array(indices))
+    qtd_blocos = _gravar_parquet_atomico(
+        path,
+        tabela.schema,
+        (tabela.slice(inicio, tamanho) for inicio, tamanho in fatias),
+        write_statistics=[coluna_mes]
+    )
+    return {"status": "ok", "row_groups": int(qtd_blocos), "linhas": int(tabela.num_rows)}
+
+
+def reparticionar_preprocessados(base_dir: Path, log=print) -> dict[str, dict]:
+    """Aplica o layout de um row group por mês às bases pré-processadas e aos derivados existentes."""
+    base_dir = Path(base_dir).resolve()
+    alvos = dict(PREPROCESSADOS_COLUNA_MES)
+    for spec in DERIVADOS_DASHPREP.values():
+        if spec.get("coluna_mes"):
+            alvos.setdefault(spec["destino"], spec["coluna_mes"])
+
+    resultados = {}
+    for nome_arquivo, coluna_mes in alvos.items():
+        path = base_dir / nome_arquivo
+        if not path.exists():
+            continue
+        inicio = time.perf_counter()
+        try:
+            resultado = reparticionar_parquet_por_mes(path, coluna_mes)
+        except Exception as exc:
+            resultado = {"status": "erro", "detalhe": f"{type(exc).__name__}: {exc}"}
+        resultado["tempo_s"] = round(time.perf_counter() - inicio, 3)
+        resultados[nome_arquivo] = resultado
+        log(f"[{nome_arquivo}] {resultado['status']} ({resultado.get('row_groups', '?')} row groups)")
+
+    manifest_path = base_dir / DASHPREP_MANIFEST_NOME
+    manifest = carregar_manifest(manifest_path)
+    alterou_manifest = False
+    for item in manifest.get("resultados", []):
+        nome_destino = re.split(r"[\\/]", str(item.get("destino", "")))[-1]
+        resultado = resultados.get(nome_destino, {})
+        if resultado.get("status") != "ok" or "row_groups" not in item:
+            continue
+        if item["row_groups"] != resultado["row_groups"]:
+            item["row_groups"] = resultado["row_groups"]
+            alterou_manifest = True
+    if alterou_manifest:
+        salvar_manifest(manifest_path, manifest)
+    return resultados
+
+
+def hash_arquivo(path: Path) -> str:
+    hasher = hashlib.sha256()
+    with open(path, "rb") as arquivo:
+        for bloco in iter(lambda: arquivo.read(DASHPREP_HASH_BLOCO_BYTES), b""):
+            hasher.update(bloco)
+    return hasher.hexdigest()
+
+
+def carregar_manifest(path: Path) -> dict:
+    if not path.exists():
+        return {}
+    try:
+        with open(path, encoding="utf-8") as arquivo:
+            manifest = json.load(arquivo)
+        return manifest if isinstance(manifest, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def salvar_manifest(path: Path, manifest: dict) -> None:
+    fd, tmp_nome = tempfile.mkstemp(prefix=".manifest_", suffix=".json.tmp", dir=path.parent)
+    with os.fdopen(fd, "w", encoding="utf-8") as arquivo:
+        json.dump(manifest, arquivo, ensure_ascii=False, indent=2)
+    os.chmod(tmp_nome, 0o644)
+    os.replace(tmp_nome, path)
+
+
+def _origem_inalterada(anterior: dict, origem: Path, destino: Path) -> tuple[bool, str | None]:
+    """Compara a origem com a execução anterior; só calcula o hash quando mtime/tamanho mudaram."""
+    if not anterior or not destino.exists() or anterior.get("versao_preparo") != DASHPREP_VERSAO:
+        return False, None
+    if anterior.get("status") not in {"ok", "inalterado"}:
+        return False, None
+    stat = origem.stat()
+    if anterior.get("origem_mtime_ns") == stat.st_mtime_ns and anterior.get("origem_tamanho") == stat.st_size:
+        return True, anterior.get("origem_sha256")
+    sha = hash_arquivo(origem)
+    return sha == anterior.get("origem_sha256"), sha
+
+
+def executar_dashprep(
+    base_dir: Path,
+    somente: list[str] | None = None,
+    forcar: bool = False,
+    origens: dict[str, str] | None = None,
+    log=print
+) -> dict:
+    """Reconstrói os derivados desatualizados e atualiza o manifesto em ``base_dir``."""
+    base_dir = Path(base_dir).resolve()
+    manifest_path = base_dir / DASHPREP_MANIFEST_NOME
+    manifest = carregar_manifest(manifest_path)
+    anteriores = {
+        item.get("nome"): item
+        for item in manifest.get("resultados", [])
+        if isinstance(item, dict) and item.get("nome")
+    }
+    origens = origens or {}
+    nomes = [nome for nome in DERIVADOS_DASHPREP if not somente or nome in somente]
+    desconhecidos = sorted(set(somente or []) - set(DERIVADOS_DASHPREP))
+    if desconhecidos:
+        raise SystemExit(f"Derivados desconhecidos: {', '.join(desconhecidos)}")
+
+    inicio_total = time.perf_counter()
+    for nome in nomes:
+        spec = DERIVADOS_DASHPREP[nome]
+        origem = Path(origens.get(nome, spec["origem"]))
+        origem = origem if origem.is_absolute() else base_dir / origem
+        destino = base_dir / spec["destino"]
+        anterior = anteriores.get(nome, {})
+        resultado = {
+            **anterior,
+            "nome": nome,
+            "origem": str(origem),
+            "destino": str(destino),
+            "versao_preparo": DASHPREP_VERSAO,
+        }
+
+        if not origem.exists():
+            resultado.update({
+                "status": "origem_ausente" if not destino.exists() else "inalterado",
+                "detalhe": f"Origem não encontrada: {origem.name}",
+            })
+            anteriores[nome] = resultado
+            log(f"[{nome}] origem ausente ({origem.name}); mantendo derivado atual")
+            continue
+
+        inicio = time.perf_counter()
+        inalterado, sha_origem = (False, None) if forcar else _origem_inalterada(anterior, origem, destino)
+        stat = origem.stat()
+        if inalterado:
+            resultado.update({
+                "status": "inalterado",
+                "detalhe": "",
+                "origem_mtime_ns": stat.st_mtime_ns,
+                "origem_tamanho": stat.st_size,
+            })
+            anteriores[nome] = resultado
+            log(f"[{nome}] inalterado")
+            continue
+
+        try:
+            df = spec["preparo"](origem)
+            tempo_preparo = time.perf_counter() - inicio
+            metricas = gravar_parquet_por_mes(df, destino, spec.get("coluna_mes"))
+            resultado.update(metricas)
+            resultado.update({
+                "status": "ok",
+                "detalhe": "",
+                "origem_mtime_ns": stat.st_mtime_ns,
+                "origem_tamanho": stat.st_size,
+                "origem_sha256": sha_origem or hash_arquivo(origem),
+                "tempo_preparo_s": round(tempo_preparo, 3),
+                "tempo_total_s": round(time.perf_counter() - inicio, 3),
+                "atualizado_em": datetime.now().isoformat(timespec="seconds"),
+            })
+            log(
+                f"[{nome}] {metricas['linhas']} linhas, {metricas['row_groups']} row groups "
+                f"em {resultado['tempo_total_s']:.2f}s"
+            )
+        except Exception as exc:
+            resultado.update({
+                "status": "erro",
+                "detalhe": f"{type(exc).__name__}: {exc}",
+                "tempo_total_s": round(time.perf_counter() - inicio, 3),
+            })
+            log(f"[{nome}] ERRO: {resultado['detalhe']}")
+        anteriores[nome] = resultado
+
+    manifest.update({
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "base_dir": str(base_dir),
+        "versao": DASHPREP_VERSAO,
+        "tempo_execucao_s": round(time.perf_counter() - inicio_total, 3),
+        "derivados": {
+            **{nome: spec["destino"] for nome, spec in DERIVADOS_DASHPREP.items()},
+            "manifest": DASHPREP_MANIFEST_NOME,
+        },
+        "resultados": [anteriores[nome] for nome in DERIVADOS_DASHPREP if nome in anteriores],
+    })
+    salvar_manifest(manifest_path, manifest)
+    return manifest
+
+
+# ==============================
+# BUNDLE CSS (estilos/*.css -> static/dashboard.<variante>.<hash>.min.css)
+# ==============================
+CSS_DASHBOARD_FONTES = (
+    "dashboard_base.css",
+    "kpi_pill_{variante}.css",
+    "dashboard_componentes.css",
+    "dashboard_ajustes.css",
+    "tabelas.css",
+)
+CSS_VARIANTES_KPI = ("clean", "contrast")
+# Strings e comentários são separados antes da compactação para não mexer em `content: "..."`.
+_CSS_TOKEN_RE = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|/\*.*?\*/', re.S)
+_CSS_ESPACO_PONTUACAO_RE = re.compile(r"\s*([{};,>])\s*")
+
+
+def _compactar_trecho_css(trecho: str) -> str:
+    trecho = re.sub(r"\s+", " ", trecho)
+    trecho = _CSS_ESPACO_PONTUACAO_RE.sub(r"\1", trecho)
+    return re.sub(r":\s+", ":", trecho)
+
+
+def minificar_css(texto: str) -> str:
+    """Remove comentários e espaços redundantes preservando o conteúdo de strings."""
+    partes = []
+    inicio = 0
+    for token in _CSS_TOKEN_RE.finditer(texto):
+        partes.append(_compactar_trecho_css(texto[inicio:token.start()]))
+        if not token.group().startswith("/*"):
+            partes.append(token.group())
+        inicio = token.end()
+    partes.append(_compactar_trecho_css(texto[inicio:]))
+    return "".join(partes).replace(";}", "}").strip()
+
+
+def versao_css_dashboard(fontes: list[Path]) -> str:
+    """Hash curto do conteúdo das fontes CSS; espelha app9.versao_css_dashboard."""
+    hasher = hashlib.sha256()
+    for fonte in fontes:
+        hasher.update(fonte.name.encode("utf-8"))
+        hasher.update(b"\0")
+        hasher.update(fonte.read_bytes())
+    return hasher.hexdigest()[:12]
+
+
+def compilar_css_dashboard(app_dir: Path, log=print) -> dict[str, dict]:
+    """Minifica o bundle CSS de cada variante de KPI em ``static/`` e remove versões antigas."""
+    app_dir = Path(app_dir).resolve()
+    static_dir = app_dir / "static"
+    static_dir.mkdir(exist_ok=True)
+    resultados = {}
+    for variante in CSS_VARIANTES_KPI:
+        fontes = [app_dir / "estilos" / nome.format(variante=variante) for nome in CSS_DASHBOARD_FONTES]
+        versao = versao_css_dashboard(fontes)
+        destino = static_dir / f"dashboard.{variante}.{versao}.min.css"
+        bruto = "\n".join(fonte.read_text(encoding="utf-8") for fonte in fontes)
+        css = minificar_css(bruto)
+        fd, tmp_nome = tempfile.mkstemp(prefix=".css_", suffix=".tmp", dir=static_dir)
+        with os.fdopen(fd, "w", encoding="utf-8", newline="\n") as arquivo:
+            arquivo.write(css)
+        os.chmod(tmp_nome, 0o644)
+        os.replace(tmp_nome, destino)
+        for antigo in static_dir.glob(f"dashboard.{variante}.*.min.css"):
+            if antigo != destino:
+                antigo.unlink()
+        resultados[variante] = {"arquivo": destino.name, "bytes_fonte": len(bruto.encode("utf-8")),
+                                "bytes_minificado": len(css.encode("utf-8"))}
+        log(f"[css] {destino.name}: {resultados[variante]['bytes_fonte']} -> "
+            f"{resultados[variante]['bytes_minificado']} bytes")
+    return resultados
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="dashprep",
+        description="Gera os parquets *_dashprep a partir das fontes brutas, apenas quando a origem muda."
+    )
+    parser.add_argument("--base-dir", default=str(Path(__file__).resolve().parent),
+                        help="Pasta com as fontes brutas e destino dos derivados (padrão: pasta do app).")
+    parser.add_argument("--somente", nargs="+", metavar="NOME",
+                        help=f"Derivados a processar ({', '.join(DERIVADOS_DASHPREP)}).")
+    parser.add_argument("--forcar", action="store_true", help="Reconstrói mesmo sem mudança na origem.")
+    parser.add_argument("--origem", action="append", default=[], metavar="NOME=ARQUIVO",
+                        help="Sobrescreve o arquivo de origem de um derivado.")
+    parser.add_argument("--reparticionar", action="store_true",
+                        help="Regrava as bases pré-processadas com um row group por mês e encerra.")
+    parser.add_argument("--css", action="store_true",
+                        help="Gera o bundle CSS minificado do app em static/ e encerra.")
+    args = parser.parse_args(argv)
+
+    if args.css:
+        compilar_css_dashboard(Path(__file__).resolve().parent)
+        return 0
+
+    if args.reparticionar:
+        resultados = reparticionar_preprocessados(Path(args.base_dir))
+        return 1 if any(item.get("status") == "erro" for item in resultados.values()) else 0
+
+    origens = {}
+    for item in args.origem:
+        nome, sep, arquivo = item.partition("=")
+        if not sep:
+            parser.error(f"--origem espera NOME=ARQUIVO, recebido: {item}")
+        origens[nome.strip()] = arquivo.strip()
+
+    manifest = executar_dashprep(Path(args.base_dir), args.somente, args.forcar, origens)
+    erros = [item["nome"] for item in manifest.get("resultados", []) if item.get("status") == "erro"]
+    return 1 if erros else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
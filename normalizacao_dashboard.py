@@ -0,0 +1,174 @@
+"""
+Regras de normalização compartilhadas pelo app (app9.py) e pelo preparo das bases (dashprep.py).
+
+Ficam aqui as chaves de texto, a conversão numérica em formato BR, a localização de
+colunas por alias e os rótulos/ordens dos indicadores do funil Fixa, para que o
+parquet gerado pelo dashprep e a carga do app apliquem exatamente as mesmas regras.
+Sem dependência de Streamlit: o dashprep roda fora do app.
+"""
+from __future__ import annotations
+
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Texto que sobra da limpeza BR e ainda representa um número (ex.: -12, 2659.40, .5).
+_PADRAO_NUMERO_LIMPO = r"^-?(?:[0-9]+\.?[0-9]*|\.[0-9]+)$"
+
+
+# ==============================
+# CHAVES DE TEXTO E COLUNAS
+# ==============================
+def normalizar_chave_visual(texto: str) -> str:
+    """Normaliza textos para comparações sem acentuação nem pontuação."""
+    base = unicodedata.normalize("NFKD", str(texto or ""))
+    base = base.encode("ASCII", "ignore").decode("ASCII").lower()
+    base = re.sub(r'[^a-z0-9]+', ' ', base).strip()
+    return base
+
+
+def normalizar_chave_funil(valor) -> str:
+    """Chave em MAIÚSCULAS_COM_UNDERSCORE usada pelos indicadores do funil Fixa."""
+    if pd.isna(valor):
+        return ""
+    texto = unicodedata.normalize("NFKD", str(valor))
+    texto = texto.encode("ASCII", "ignore").decode("ASCII")
+    texto = texto.strip().upper()
+    texto = re.sub(r"[^A-Z0-9]+", "_", texto)
+    return re.sub(r"_+", "_", texto).strip("_")
+
+
+def encontrar_coluna_por_alias(colunas, *aliases: str) -> str | None:
+    """Localiza uma coluna por alias, ignorando acentos e pequenas variacoes de nome."""
+    mapa_colunas: dict[str, str] = {}
+    for coluna in colunas:
+        chave = normalizar_chave_visual(coluna)
+        if chave and chave not in mapa_colunas:
+            mapa_colunas[chave] = coluna
+
+    for alias in aliases:
+        coluna_real = mapa_colunas.get(normalizar_chave_visual(alias))
+        if coluna_real:
+            return coluna_real
+    return None
+
+
+# ==============================
+# NÚMEROS EM FORMATO BR
+# ==============================
+def normalizar_numerico_serie(serie):
+    """
+    Normaliza series numéricas incluindo textos em formato BR
+    (ex.: 2.659,40 -> 2659.40).
+
+    Colunas já numéricas (parquet) saem direto; texto é limpo e convertido
+    pelos kernels do pyarrow em uma passada, sem laço Python por célula.
+    """
+    if not isinstance(serie, pd.Series):
+        serie = pd.Series(serie)
+    if pd.api.types.is_numeric_dtype(serie):
+        return pd.to_numeric(serie, errors='coerce')
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        # Converte só as categorias; o código -1 (nulo) aponta para o NaN anexado ao final.
+        categorias = normalizar_numerico_serie(pd.Series(serie.cat.categories.astype(str), dtype=object))
+        codigos = serie.cat.codes.to_numpy()
+        if (codigos < 0).any():
+            categorias = pd.concat([categorias.astype(float), pd.Series([np.nan])], ignore_index=True)
+        return pd.Series(categorias.to_numpy()[codigos], index=serie.index, name=serie.name)
+    if serie.empty:
+        return pd.to_numeric(serie.astype(str), errors='coerce')
+
+    # Mesma limpeza de antes: sai o milhar ".", a vírgula vira ponto e o resto fora de [0-9.-] é descartado.
+    texto = pa.array(serie.astype(str).to_numpy(dtype=object), type=pa.string())
+    texto = pc.replace_substring(pc.replace_substring_regex(texto, r"[^0-9,\-]", ""), ",", ".")
+    validos = pc.match_substring_regex(texto, _PADRAO_NUMERO_LIMPO)
+    if pc.all(validos).as_py() and not pc.any(pc.match_substring(texto, ".")).as_py():
+        # Tudo inteiro e sem nulos: mantém int64 como o to_numeric fazia.
+        try:
+            return pd.Series(pc.cast(texto, pa.int64()).to_numpy(), index=serie.index, name=serie.name)
+        except pa.ArrowInvalid:
+            pass
+    numeros = pc.cast(pc.if_else(validos, texto, pa.scalar(None, pa.string())), pa.float64())
+    return pd.Series(numeros.to_numpy(zero_copy_only=False), index=serie.index, name=serie.name)
+
+
+# ==============================
+# FUNIL FIXA E-COMMERCE
+# ==============================
+FUNIL_FIXA_INDICADORES_CONFIG = [
+    ("INVESTIMENTO", "INVESTIMENTO", 1),
+    ("SESSOES", "SESSÕES", 2),
+    ("PORTEIRA_CEP", "PORTEIRA CEP", 3),
+    ("DADOS_PESSOAIS", "DADOS PESSOAIS", 4),
+    ("ENDERECO", "ENDEREÇO", 5),
+    ("PAGAMENTO", "PAGAMENTO", 6),
+    ("PEDIDOS_TOTAL", "PEDIDOS_TOTAL", 7),
+    ("REJEITADO", "REJEITADO", 8),
+    ("VENDA_BRUTA", "VENDA BRUTA", 9),
+    ("DESISTENCIA", "DESISTÊNCIA", 10),
+    ("INSTALACAO", "INSTALAÇÃO", 11),
+]
+FUNIL_FIXA_INDICADOR_LABELS = {
+    chave: label for chave, label, _ in FUNIL_FIXA_INDICADORES_CONFIG
+}
+FUNIL_FIXA_INDICADOR_ORDENS = {
+    chave: ordem for chave, _, ordem in FUNIL_FIXA_INDICADORES_CONFIG
+}
+
+
+def normalizar_segmento_funil(valor) -> str:
+    """RESIDENCIAL_CABO/PF viram PF e PME segue PME; os demais saem como vieram."""
+    chave = normalizar_chave_funil(valor)
+    if chave in {"RESIDENCIAL_CABO", "PF"}:
+        return "PF"
+    if chave == "PME":
+        return "PME"
+    return str(valor).strip()
+
+
+def _mapear_distintos(serie: pd.Series, normalizador) -> pd.Series:
+    """``serie.map(normalizador)`` avaliando cada valor distinto uma única vez."""
+    if serie.empty or isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.map(normalizador)
+    codigos, distintos = pd.factorize(serie, use_na_sentinel=True)
+    valores = np.array([normalizador(valor) for valor in distintos] + [normalizador(None)], dtype=object)
+    return pd.Series(valores[codigos], index=serie.index, name=serie.name)
+
+
+def normalizar_indicadores_funil_fixa(df_funil: pd.DataFrame, mapear=_mapear_distintos) -> pd.DataFrame:
+    """Mantém só os indicadores conhecidos do funil, com chave, rótulo de exibição e ordem.
+
+    ``mapear(serie, normalizador)`` aplica a chave aos valores; o app passa o
+    normalizador com memo do processo.
+    """
+    if df_funil is None or df_funil.empty or 'INDICADOR' not in df_funil.columns:
+        return df_funil
+
+    df = df_funil.copy()
+    if 'INDICADOR_CHAVE' in df.columns:
+        chave_base = df['INDICADOR_CHAVE'].astype('object')
+        mask_chave_vazia = chave_base.isna() | chave_base.astype(str).str.strip().eq('')
+        chave_base.loc[mask_chave_vazia] = df.loc[mask_chave_vazia, 'INDICADOR']
+    else:
+        chave_base = df['INDICADOR']
+
+    df['INDICADOR_CHAVE'] = mapear(chave_base, normalizar_chave_funil)
+    df = df[df['INDICADOR_CHAVE'].isin(FUNIL_FIXA_INDICADOR_LABELS.keys())].copy()
+    if df.empty:
+        return df
+
+    df['INDICADOR'] = df['INDICADOR_CHAVE'].map(FUNIL_FIXA_INDICADOR_LABELS)
+    if 'INDICADOR_ORDEM' not in df.columns:
+        df['INDICADOR_ORDEM'] = 999.0
+    df['INDICADOR_ORDEM'] = normalizar_numerico_serie(df['INDICADOR_ORDEM']).fillna(999.0)
+    df['INDICADOR_ORDEM'] = (
+        df['INDICADOR_CHAVE']
+        .map(FUNIL_FIXA_INDICADOR_ORDENS)
+        .fillna(df['INDICADOR_ORDEM'])
+        .astype(float)
+    )
+    return df